@@ -1,27 +1,51 @@
-from fianco_ai import negamax
+from fianco_ai import negamax, new_search, set_weights, tt_best_move
 from fianco import BLACK
-import numpy as np
-import threading
-import time
+
+# Half-width of the window around the previous depth's score
+ASPIRATION_WINDOW = 50
+
+def walk_pv(game_state, first_move, max_len):
+    # Rebuild the principal variation from the transposition table's best moves
+    pv = []
+    move = first_move
+    while move is not None and len(pv) < max_len:
+        move = ((move[0], move[1]), (move[2], move[3]))
+        if game_state.winner is not None or move not in game_state.get_valid_moves():
+            break
+        game_state.make_move(move)
+        pv.append(move)
+        move = tt_best_move(game_state.hash)
+    for _ in pv:
+        game_state.undo_move()
+    return pv
 
 def get_best_move(game_state, max_depth, pv_callback, weights):
-    board = game_state.board.astype(np.int32)
+    black_bb, white_bb = game_state.black_bb, game_state.white_bb
     player = game_state.current_player
     best_move = None
     evaluation = 0
+    set_weights(weights)
+    # Keep the previous turns' table entries, but let this turn replace them
+    new_search()
 
-    # Run negamax in a separate thread
     for depth in range(1, max_depth + 1):
-        best_move, evaluation, pv = negamax(board, depth, player, weights)
+        # Aspiration window around the previous score, full window if it fails
+        if depth > 1:
+            alpha, beta = evaluation - ASPIRATION_WINDOW, evaluation + ASPIRATION_WINDOW
+            move, score = negamax(black_bb, white_bb, depth, player,
+                                  hint_move=best_move, alpha=alpha, beta=beta)
+            if score <= alpha or score >= beta:
+                move, score = negamax(black_bb, white_bb, depth, player, hint_move=best_move)
+        else:
+            move, score = negamax(black_bb, white_bb, depth, player, hint_move=best_move)
+        best_move, evaluation = move, score
 
-        # Adjust evaluation for consistency
-        if player == BLACK:
-            evaluation = -evaluation
-        
-        pv_moves = [((mv[0], mv[1]), (mv[2], mv[3])) for mv in pv]
+        # Publish the principal variation once the depth is complete
+        pv_callback(walk_pv(game_state, best_move, depth))
 
-        pv_callback(pv_moves)
-        time.sleep(0.1)
+    # Adjust evaluation for consistency
+    if player == BLACK:
+        evaluation = -evaluation
 
     # If no move found, pick any valid move
     if best_move is None:
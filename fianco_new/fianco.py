@@ -29,75 +29,252 @@ CAPTURE_DIRECTIONS = {
     WHITE: [(-1, -1), (-1, 1)]
 }
 
+# Bitboards: one int per color, square (row, col) is bit row * BOARD_SIZE + col
+NUM_SQUARES = BOARD_SIZE * BOARD_SIZE
+BOARD_MASK = (1 << NUM_SQUARES) - 1
+FILE_A = sum(1 << (row * BOARD_SIZE) for row in range(BOARD_SIZE))
+SQUARES = tuple(divmod(sq, BOARD_SIZE) for sq in range(NUM_SQUARES))
+
+
+def square(row, col):
+    return row * BOARD_SIZE + col
+
+
+def board_to_bitboards(board):
+    black_bb = white_bb = 0
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            if board[row][col] == BLACK:
+                black_bb |= 1 << square(row, col)
+            elif board[row][col] == WHITE:
+                white_bb |= 1 << square(row, col)
+    return black_bb, white_bb
+
+
+def _source_mask(col_diff):
+    # Squares from which a step of col_diff columns stays on the board
+    mask = BOARD_MASK
+    for col in range(BOARD_SIZE):
+        if not 0 <= col + col_diff < BOARD_SIZE:
+            mask &= ~(FILE_A << col)
+    return mask
+
+
+def _shift(bb, n):
+    return (bb << n) & BOARD_MASK if n >= 0 else bb >> -n
+
+
+# (square delta, source mask) per direction; rows falling off the board are cut by BOARD_MASK
+MOVE_SHIFTS = {
+    player: [(dr * BOARD_SIZE + dc, _source_mask(dc)) for dr, dc in directions]
+    for player, directions in DIRECTIONS.items()
+}
+
+CAPTURE_SHIFTS = {
+    player: [(dr * BOARD_SIZE + dc, _source_mask(2 * dc)) for dr, dc in directions]
+    for player, directions in CAPTURE_DIRECTIONS.items()
+}
+
+START_BLACK_BB, START_WHITE_BB = board_to_bitboards(START_POSITION)
+
+
+def _within_bounds(row, col):
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+# Per player and square: destinations of normal moves, and (jumped, destination)
+# pairs of captures, with off-board squares already filtered out
+MOVE_TARGETS = {
+    player: tuple(
+        tuple(square(row + dr, col + dc) for dr, dc in directions if _within_bounds(row + dr, col + dc))
+        for row, col in SQUARES
+    )
+    for player, directions in DIRECTIONS.items()
+}
+
+CAPTURE_TARGETS = {
+    player: tuple(
+        tuple(
+            (square(row + dr, col + dc), square(row + 2 * dr, col + 2 * dc))
+            for dr, dc in directions if _within_bounds(row + 2 * dr, col + 2 * dc)
+        )
+        for row, col in SQUARES
+    )
+    for player, directions in CAPTURE_DIRECTIONS.items()
+}
+
+# The same destinations as bitmasks, for testing a single move with a few ANDs
+MOVE_MASKS = {
+    player: tuple(sum(1 << dst_sq for dst_sq in dsts) for dsts in targets)
+    for player, targets in MOVE_TARGETS.items()
+}
+
+CAPTURE_MASKS = {
+    player: tuple(sum(1 << dst_sq for _, dst_sq in pairs) for pairs in targets)
+    for player, targets in CAPTURE_TARGETS.items()
+}
+
+# Zobrist keys per color and square, plus one for black to move. Generated with
+# splitmix64 from the same seed as fianco_ai so both sides agree on hashes.
+ZOBRIST_SEED = 0x0F1A4C00
+MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(state):
+    state = (state + 0x9E3779B97F4A7C15) & MASK64
+    z = state
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return state, z ^ (z >> 31)
+
+
+def _zobrist_keys(count):
+    keys = []
+    state = ZOBRIST_SEED
+    for _ in range(count):
+        state, key = _splitmix64(state)
+        keys.append(key)
+    return keys
+
+
+_keys = _zobrist_keys(2 * NUM_SQUARES + 1)
+ZOBRIST = (tuple(_keys[:NUM_SQUARES]), tuple(_keys[NUM_SQUARES:-1]))
+ZOBRIST_SIDE = _keys[-1]
+
+
+def color_index(player):
+    return 0 if player == BLACK else 1
+
+
+def zobrist_hash(black_bb, white_bb, player):
+    h = ZOBRIST_SIDE if player == BLACK else 0
+    for sq in range(NUM_SQUARES):
+        if black_bb >> sq & 1:
+            h ^= ZOBRIST[0][sq]
+        elif white_bb >> sq & 1:
+            h ^= ZOBRIST[1][sq]
+    return h
+
+
+def _emit_moves(moves, targets, delta):
+    while targets:
+        bit = targets & -targets
+        to_sq = bit.bit_length() - 1
+        moves.append((to_sq - delta, to_sq))
+        targets ^= bit
+
+
+def gen_moves(own, opp, player):
+    """Generate (from, to) square pairs for player with one shift/AND per direction.
+
+    Only captures are returned when any capture is available. Returns the move
+    list and whether it holds captures.
+    """
+    empty = ~(own | opp) & BOARD_MASK
+    moves = []
+
+    for delta, mask in CAPTURE_SHIFTS[player]:
+        targets = _shift(own & mask, 2 * delta) & _shift(opp, delta) & empty
+        _emit_moves(moves, targets, 2 * delta)
+    if moves:
+        return moves, True
+
+    for delta, mask in MOVE_SHIFTS[player]:
+        targets = _shift(own & mask, delta) & empty
+        _emit_moves(moves, targets, delta)
+    return moves, False
+
+
+START_HASH = zobrist_hash(START_BLACK_BB, START_WHITE_BB, WHITE)
+
+
 class GameState:
     def __init__(self):
-        self.board = np.array(START_POSITION, dtype=int)
+        self.black_bb = START_BLACK_BB
+        self.white_bb = START_WHITE_BB
         self.current_player = WHITE
+        self.hash = START_HASH
         self.move_history = []
         self.winner = None
+        self._undo_stack = []
+        self._valid_moves_cache = None
+        self._capture_available = False
+
+    @property
+    def board(self):
+        board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+        for sq, (row, col) in enumerate(SQUARES):
+            if self.black_bb >> sq & 1:
+                board[row, col] = BLACK
+            elif self.white_bb >> sq & 1:
+                board[row, col] = WHITE
+        return board
+
+    def piece_at(self, row, col):
+        bit = 1 << square(row, col)
+        if self.black_bb & bit:
+            return BLACK
+        if self.white_bb & bit:
+            return WHITE
+        return EMPTY
+
+    def get_bitboards(self, player):
+        # (own, opponent) bitboards from player's point of view
+        if player == BLACK:
+            return self.black_bb, self.white_bb
+        return self.white_bb, self.black_bb
 
     def is_valid_move(self, from_pos, to_pos):
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
-        if not self.is_within_bounds(to_row, to_col):
-            return False
-        if self.board[from_row, from_col] != self.current_player:
+        if not (self.is_within_bounds(*from_pos) and self.is_within_bounds(*to_pos)):
             return False
-        if self.board[to_row, to_col] != EMPTY:
+        from_sq, to_sq = square(*from_pos), square(*to_pos)
+        own, opp = self.get_bitboards(self.current_player)
+        if not own >> from_sq & 1:
             return False
+        to_bit = 1 << to_sq
+        empty = ~(own | opp)
 
-        row_diff = to_row - from_row
-        col_diff = to_col - from_col
-
-        # Normal move
-        if (row_diff, col_diff) in DIRECTIONS[self.current_player]:
-            return True
+        # Normal move: destination must be empty
+        if MOVE_MASKS[self.current_player][from_sq] & to_bit:
+            return bool(empty & to_bit)
 
-        # Capture move
-        if (row_diff, col_diff) in [(d[0]*2, d[1]*2) for d in CAPTURE_DIRECTIONS[self.current_player]]:
-            mid_row = (from_row + to_row) // 2
-            mid_col = (from_col + to_col) // 2
-            if self.board[mid_row, mid_col] == -self.current_player:
-                return True
+        # Capture move: empty destination and an opponent on the jumped square, in one compare
+        if CAPTURE_MASKS[self.current_player][from_sq] & to_bit:
+            mid_bit = 1 << (from_sq + to_sq) // 2
+            return (empty & to_bit | opp & mid_bit) == to_bit | mid_bit
 
         return False
 
     def get_valid_moves(self):
-        moves = []
-        capture_moves = []
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.board[row, col] == self.current_player:
-                    piece_moves, piece_capture_moves = self.get_piece_moves((row, col))
-                    moves.extend(piece_moves)
-                    capture_moves.extend(piece_capture_moves)
-        if capture_moves:
-            return capture_moves  # Only return capture moves if available
-        else:
-            return moves
+        # Cached until the position changes; callers must not modify the list
+        if self._valid_moves_cache is None:
+            own, opp = self.get_bitboards(self.current_player)
+            moves, self._capture_available = gen_moves(own, opp, self.current_player)
+            self._valid_moves_cache = [(SQUARES[from_sq], SQUARES[to_sq]) for from_sq, to_sq in moves]
+        return self._valid_moves_cache
+
+    def is_capture_available(self):
+        self.get_valid_moves()
+        return self._capture_available
 
     def get_piece_moves(self, pos):
-        moves = []
-        capture_moves = []
-        row, col = pos
+        from_sq = square(*pos)
+        own, opp = self.get_bitboards(self.current_player)
+        occupied = own | opp
 
         # Capture moves
-        for dr, dc in CAPTURE_DIRECTIONS[self.current_player]:
-            mid_row, mid_col = row + dr, col + dc
-            new_row, new_col = row + 2 * dr, col + 2 * dc
-            if self.is_within_bounds(new_row, new_col) and self.board[new_row, new_col] == EMPTY:
-                if self.board[mid_row, mid_col] == -self.current_player:
-                    capture_moves.append((pos, (new_row, new_col)))
-
+        capture_moves = [
+            (pos, SQUARES[dst_sq]) for mid_sq, dst_sq in CAPTURE_TARGETS[self.current_player][from_sq]
+            if opp >> mid_sq & 1 and not occupied >> dst_sq & 1
+        ]
         if capture_moves:
             return [], capture_moves
 
         # Normal moves
-        for dr, dc in DIRECTIONS[self.current_player]:
-            new_row, new_col = row + dr, col + dc
-            if self.is_within_bounds(new_row, new_col) and self.board[new_row, new_col] == EMPTY:
-                moves.append((pos, (new_row, new_col)))
-
+        moves = [
+            (pos, SQUARES[dst_sq]) for dst_sq in MOVE_TARGETS[self.current_player][from_sq]
+            if not occupied >> dst_sq & 1
+        ]
         return moves, []
 
 
@@ -106,18 +283,33 @@ class GameState:
         from_row, from_col = from_pos
         to_row, to_col = to_pos
 
+        from_sq, to_sq = square(from_row, from_col), square(to_row, to_col)
+        # The XOR update below would silently overlap colours on a bad move
+        own, opp = self.get_bitboards(self.current_player)
+        if not own >> from_sq & 1 or (own | opp) >> to_sq & 1:
+            raise ValueError(f"illegal move {move} for player {self.current_player}")
+        move_bits = (1 << from_sq) | (1 << to_sq)
+        capture_bit = 0
+        color = color_index(self.current_player)
+        hash_diff = ZOBRIST[color][from_sq] ^ ZOBRIST[color][to_sq] ^ ZOBRIST_SIDE
+
         # Check if it's a capture
         if abs(to_row - from_row) == 2:
             mid_row = (from_row + to_row) // 2
             mid_col = (from_col + to_col) // 2
-            self.board[mid_row, mid_col] = EMPTY
+            capture_bit = 1 << square(mid_row, mid_col)
+            if not opp & capture_bit:
+                raise ValueError(f"illegal move {move} for player {self.current_player}")
+            hash_diff ^= ZOBRIST[1 - color][square(mid_row, mid_col)]
             capture = True
         else:
             capture = False
 
-        # Move the piece
-        self.board[to_row, to_col] = self.board[from_row, from_col]
-        self.board[from_row, from_col] = EMPTY
+        # Move the piece, remembering how to take it back
+        self._undo_stack.append((move_bits, capture_bit, hash_diff, self.winner))
+        self._toggle_bits(self.current_player, move_bits, capture_bit)
+        self.hash ^= hash_diff
+        self._valid_moves_cache = None
 
         # Record the move
         move_notation = self.get_move_notation(move, capture)
@@ -131,15 +323,33 @@ class GameState:
         # Switch player
         self.current_player *= -1
 
+    def undo_move(self):
+        move_bits, capture_bit, hash_diff, winner = self._undo_stack.pop()
+        self.current_player *= -1
+        self._toggle_bits(self.current_player, move_bits, capture_bit)
+        self.hash ^= hash_diff
+        self._valid_moves_cache = None
+        self.winner = winner
+        self.move_history.pop()
+
+    def _toggle_bits(self, player, move_bits, capture_bit):
+        # XOR is its own inverse, so this both makes and unmakes a move
+        if player == BLACK:
+            self.black_bb ^= move_bits
+            self.white_bb ^= capture_bit
+        else:
+            self.white_bb ^= move_bits
+            self.black_bb ^= capture_bit
+
     def is_game_over(self):
         return self.winner is not None or not self.get_valid_moves()
 
     def evaluate(self):
         # Simple evaluation function
-        return np.sum(self.board)
+        return self.black_bb.bit_count() - self.white_bb.bit_count()
 
     def is_within_bounds(self, row, col):
-        return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+        return _within_bounds(row, col)
 
     def get_move_notation(self, move, capture):
         from_pos, to_pos = move
@@ -154,12 +364,29 @@ class GameState:
         row_number = BOARD_SIZE - row
         return f'{col_letter}{row_number}'
     
-    def copy(self):
-        new_state = GameState()
-        new_state.board = self.board.copy()
-        new_state.current_player = self.current_player
-        new_state.move_history = self.move_history.copy()
-        new_state.winner = self.winner
+    @classmethod
+    def _from_raw(cls, black_bb, white_bb, current_player, winner, hash):
+        # Snapshot from plain scalars, without running __init__
+        state = cls.__new__(cls)
+        state.black_bb = black_bb
+        state.white_bb = white_bb
+        state.current_player = current_player
+        state.hash = hash
+        state.move_history = []
+        state.winner = winner
+        state._undo_stack = []
+        state._valid_moves_cache = None
+        state._capture_available = False
+        return state
+
+    def copy(self, with_history=True):
+        # The AI only needs the position; the history is for display and undo
+        new_state = GameState._from_raw(self.black_bb, self.white_bb, self.current_player, self.winner, self.hash)
+        if with_history:
+            new_state.move_history = self.move_history.copy()
+            new_state._undo_stack = self._undo_stack.copy()
+        new_state._valid_moves_cache = self._valid_moves_cache
+        new_state._capture_available = self._capture_available
         return new_state
 
     def reset(self):
@@ -0,0 +1,285 @@
+// Bitboard representation of a Fianco position: one u128 per color,
+// square (row, col) is bit row * BOARD_SIZE + col (same layout as fianco.py).
+
+pub const BOARD_SIZE: i32 = 9;
+pub const NUM_SQUARES: usize = 81;
+pub const BLACK: i32 = 1;
+pub const WHITE: i32 = -1;
+
+pub const BOARD_MASK: u128 = (1 << NUM_SQUARES) - 1;
+const FILE_A: u128 = file_a();
+const ROW_0: u128 = (1 << BOARD_SIZE) - 1;
+const ROW_8: u128 = ROW_0 << (NUM_SQUARES - BOARD_SIZE as usize);
+
+const fn file_a() -> u128 {
+    let mut bb = 0;
+    let mut row = 0;
+    while row < BOARD_SIZE {
+        bb |= 1 << (row * BOARD_SIZE);
+        row += 1;
+    }
+    bb
+}
+
+// Squares from which a step of col_diff columns stays on the board
+const fn source_mask(col_diff: i32) -> u128 {
+    let mut mask = BOARD_MASK;
+    let mut col = 0;
+    while col < BOARD_SIZE {
+        if col + col_diff < 0 || col + col_diff >= BOARD_SIZE {
+            mask &= !(FILE_A << col);
+        }
+        col += 1;
+    }
+    mask
+}
+
+// (square delta, source mask) per direction, mirroring DIRECTIONS / CAPTURE_DIRECTIONS
+const BLACK_MOVES: [(i32, u128); 3] = [(9, BOARD_MASK), (-1, source_mask(-1)), (1, source_mask(1))];
+const WHITE_MOVES: [(i32, u128); 3] = [(-9, BOARD_MASK), (-1, source_mask(-1)), (1, source_mask(1))];
+const BLACK_CAPTURES: [(i32, u128); 2] = [(8, source_mask(-2)), (10, source_mask(2))];
+const WHITE_CAPTURES: [(i32, u128); 2] = [(-10, source_mask(-2)), (-8, source_mask(2))];
+
+pub fn move_directions(player: i32) -> &'static [(i32, u128); 3] {
+    if player == BLACK {
+        &BLACK_MOVES
+    } else {
+        &WHITE_MOVES
+    }
+}
+
+pub fn capture_directions(player: i32) -> &'static [(i32, u128); 2] {
+    if player == BLACK {
+        &BLACK_CAPTURES
+    } else {
+        &WHITE_CAPTURES
+    }
+}
+
+#[inline]
+pub fn shift(bb: u128, n: i32) -> u128 {
+    if n >= 0 {
+        (bb << n) & BOARD_MASK
+    } else {
+        bb >> -n
+    }
+}
+
+/// Moves are packed into 16 bits as from << 7 | to.
+pub type Move = u16;
+pub const NO_MOVE: Move = 0;
+
+#[inline]
+pub fn encode_move(from: usize, to: usize) -> Move {
+    ((from << 7) | to) as Move
+}
+
+#[inline]
+pub fn move_from(mv: Move) -> usize {
+    (mv >> 7) as usize
+}
+
+#[inline]
+pub fn move_to(mv: Move) -> usize {
+    (mv & 0x7f) as usize
+}
+
+#[inline]
+pub fn is_capture(mv: Move) -> bool {
+    move_from(mv).abs_diff(move_to(mv)) > BOARD_SIZE as usize
+}
+
+pub const MAX_MOVES: usize = 64;
+
+/// Fixed-capacity move buffer. It lives on the stack of each search node, so
+/// generating moves never allocates.
+pub struct MoveList {
+    moves: [Move; MAX_MOVES],
+    len: usize,
+}
+
+impl MoveList {
+    pub fn new() -> Self {
+        MoveList { moves: [NO_MOVE; MAX_MOVES], len: 0 }
+    }
+
+    #[inline]
+    pub fn push(&mut self, mv: Move) {
+        self.moves[self.len] = mv;
+        self.len += 1;
+    }
+}
+
+impl Default for MoveList {
+    fn default() -> Self {
+        Self::new()
+    }
+}
+
+impl std::ops::Deref for MoveList {
+    type Target = [Move];
+
+    fn deref(&self) -> &[Move] {
+        &self.moves[..self.len]
+    }
+}
+
+impl std::ops::DerefMut for MoveList {
+    fn deref_mut(&mut self) -> &mut [Move] {
+        &mut self.moves[..self.len]
+    }
+}
+
+fn push_moves(moves: &mut MoveList, mut targets: u128, delta: i32) {
+    while targets != 0 {
+        let to = targets.trailing_zeros() as i32;
+        targets &= targets - 1;
+        moves.push(encode_move((to - delta) as usize, to as usize));
+    }
+}
+
+// Zobrist keys, generated with splitmix64 so fianco.py can reproduce them
+const ZOBRIST_SEED: u64 = 0x0F1A_4C00;
+
+const fn splitmix64(state: u64) -> (u64, u64) {
+    let state = state.wrapping_add(0x9E37_79B9_7F4A_7C15);
+    let mut z = state;
+    z = (z ^ (z >> 30)).wrapping_mul(0xBF58_476D_1CE4_E5B9);
+    z = (z ^ (z >> 27)).wrapping_mul(0x94D0_49BB_1331_11EB);
+    (state, z ^ (z >> 31))
+}
+
+const fn zobrist_keys() -> ([[u64; NUM_SQUARES]; 2], u64) {
+    let mut keys = [[0; NUM_SQUARES]; 2];
+    let mut state = ZOBRIST_SEED;
+    let mut color = 0;
+    while color < 2 {
+        let mut sq = 0;
+        while sq < NUM_SQUARES {
+            let (next, key) = splitmix64(state);
+            state = next;
+            keys[color][sq] = key;
+            sq += 1;
+        }
+        color += 1;
+    }
+    let (_, side) = splitmix64(state);
+    (keys, side)
+}
+
+const ZOBRIST_KEYS: ([[u64; NUM_SQUARES]; 2], u64) = zobrist_keys();
+pub static ZOBRIST: [[u64; NUM_SQUARES]; 2] = ZOBRIST_KEYS.0;
+pub const ZOBRIST_SIDE: u64 = ZOBRIST_KEYS.1;
+
+#[inline]
+pub fn color_index(player: i32) -> usize {
+    if player == BLACK {
+        0
+    } else {
+        1
+    }
+}
+
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub struct Position {
+    pub black: u128,
+    pub white: u128,
+    pub player: i32,
+    pub hash: u64,
+}
+
+impl Position {
+    pub fn new(black: u128, white: u128, player: i32) -> Self {
+        let mut hash = if player == BLACK { ZOBRIST_SIDE } else { 0 };
+        for (color, mut bb) in [(0, black), (1, white)] {
+            while bb != 0 {
+                hash ^= ZOBRIST[color][bb.trailing_zeros() as usize];
+                bb &= bb - 1;
+            }
+        }
+        Position { black, white, player, hash }
+    }
+
+    #[inline]
+    pub fn own(&self) -> u128 {
+        if self.player == BLACK {
+            self.black
+        } else {
+            self.white
+        }
+    }
+
+    #[inline]
+    pub fn opp(&self) -> u128 {
+        if self.player == BLACK {
+            self.white
+        } else {
+            self.black
+        }
+    }
+
+    /// True when the previous move put a piece on its last row.
+    #[inline]
+    pub fn is_lost(&self) -> bool {
+        if self.player == BLACK {
+            self.white & ROW_0 != 0
+        } else {
+            self.black & ROW_8 != 0
+        }
+    }
+
+    /// Append the legal moves to `moves`; only captures when any capture is available.
+    /// Returns whether the generated moves are captures.
+    pub fn generate_moves(&self, moves: &mut MoveList) -> bool {
+        let start = moves.len();
+        self.generate_captures(moves);
+        if moves.len() > start {
+            return true;
+        }
+
+        let empty = !(self.black | self.white) & BOARD_MASK;
+        for &(delta, mask) in move_directions(self.player) {
+            push_moves(moves, shift(self.own() & mask, delta) & empty, delta);
+        }
+        false
+    }
+
+    /// Append only the captures, jumping two rows over an opponent piece.
+    pub fn generate_captures(&self, moves: &mut MoveList) {
+        let (own, opp) = (self.own(), self.opp());
+        let empty = !(own | opp) & BOARD_MASK;
+        for &(delta, mask) in capture_directions(self.player) {
+            let targets = shift(own & mask, 2 * delta) & shift(opp, delta) & empty;
+            push_moves(moves, targets, 2 * delta);
+        }
+    }
+
+    pub fn make_move(&self, mv: Move) -> Position {
+        let (from, to) = (move_from(mv), move_to(mv));
+        let color = color_index(self.player);
+        let own = self.own() ^ (1 << from) ^ (1 << to);
+        let mut opp = self.opp();
+        let mut hash = self.hash ^ ZOBRIST[color][from] ^ ZOBRIST[color][to] ^ ZOBRIST_SIDE;
+
+        if is_capture(mv) {
+            let mid = (from + to) / 2;
+            opp &= !(1 << mid);
+            hash ^= ZOBRIST[1 - color][mid];
+        }
+
+        let (black, white) = if self.player == BLACK { (own, opp) } else { (opp, own) };
+        Position { black, white, player: -self.player, hash }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    // Same values as test_zobrist.py pins for fianco.py, so both sides hash alike
+    #[test]
+    fn zobrist_matches_python() {
+        assert_eq!(ZOBRIST_SIDE, 0x61729b38ccfd3cdd);
+        assert_eq!(Position::new(0x1411105ff, 0x1ff411105000000000000, WHITE).hash, 0x4681cfdef1afa554);
+    }
+}
@@ -0,0 +1,110 @@
+// Static evaluation, scored from the point of view of the side to move.
+
+use crate::board::*;
+
+pub struct Weights {
+    pub piece_value: f64,
+    pub advancement_value: f64,
+    pub unstoppable_pawn_bonus: f64,
+    pub opponent_unstoppable_pawn_penalty: f64,
+    pub center_control_value: f64,
+    pub mobility_value: f64,
+    pub edge_pawn_bonus: f64,
+}
+
+// Squares ahead of each piece from which an opponent could still intercept it
+const CONES: [[u128; NUM_SQUARES]; 2] = cones();
+
+const fn cones() -> [[u128; NUM_SQUARES]; 2] {
+    let mut cones = [[0; NUM_SQUARES]; 2];
+    let mut sq = 0;
+    while sq < NUM_SQUARES {
+        let (row, col) = ((sq as i32) / BOARD_SIZE, (sq as i32) % BOARD_SIZE);
+        let mut other = 0;
+        while other < NUM_SQUARES {
+            let (r, c) = ((other as i32) / BOARD_SIZE, (other as i32) % BOARD_SIZE);
+            if r > row && (c - col).abs() <= r - row {
+                cones[0][sq] |= 1 << other;
+            }
+            if r < row && (c - col).abs() <= row - r {
+                cones[1][sq] |= 1 << other;
+            }
+            other += 1;
+        }
+        sq += 1;
+    }
+    cones
+}
+
+fn mobility(own: u128, opp: u128, player: i32) -> u32 {
+    let empty = !(own | opp) & BOARD_MASK;
+    move_directions(player)
+        .iter()
+        .map(|&(delta, mask)| (shift(own & mask, delta) & empty).count_ones())
+        .sum()
+}
+
+/// Evaluation terms from `Weights` with everything that depends only on the
+/// square (material, advancement, center control, edge bonus) folded into one
+/// precomputed value per color and square.
+#[derive(Clone)]
+pub struct Evaluator {
+    square_values: [[f64; NUM_SQUARES]; 2],
+    unstoppable_pawn_bonus: f64,
+    opponent_unstoppable_pawn_penalty: f64,
+    mobility_value: f64,
+}
+
+impl Evaluator {
+    pub fn new(weights: &Weights) -> Self {
+        let mut square_values = [[0.0; NUM_SQUARES]; 2];
+        for (color, player) in [(0, BLACK), (1, WHITE)] {
+            for (sq, value) in square_values[color].iter_mut().enumerate() {
+                let (row, col) = (sq as i32 / BOARD_SIZE, sq as i32 % BOARD_SIZE);
+                let advancement = if player == BLACK { row } else { BOARD_SIZE - 1 - row };
+                *value = weights.piece_value
+                    + weights.advancement_value * advancement as f64
+                    + weights.center_control_value * (4 - (col - 4).abs()) as f64;
+                if col == 0 || col == BOARD_SIZE - 1 {
+                    *value += weights.edge_pawn_bonus;
+                }
+            }
+        }
+        Evaluator {
+            square_values,
+            unstoppable_pawn_bonus: weights.unstoppable_pawn_bonus,
+            opponent_unstoppable_pawn_penalty: weights.opponent_unstoppable_pawn_penalty,
+            mobility_value: weights.mobility_value,
+        }
+    }
+
+    // Square values for one side, plus its number of unstoppable pieces
+    fn side_score(&self, mut pieces: u128, opp: u128, player: i32) -> (f64, f64) {
+        let color = color_index(player);
+        let (values, cones) = (&self.square_values[color], &CONES[color]);
+        let mut score = 0.0;
+        let mut unstoppable = 0.0;
+        while pieces != 0 {
+            let sq = pieces.trailing_zeros() as usize;
+            pieces &= pieces - 1;
+            score += values[sq];
+            if cones[sq] & opp == 0 {
+                unstoppable += 1.0;
+            }
+        }
+        (score, unstoppable)
+    }
+
+    pub fn evaluate(&self, pos: &Position) -> i32 {
+        let (own, opp) = (pos.own(), pos.opp());
+        let (own_score, own_unstoppable) = self.side_score(own, opp, pos.player);
+        let (opp_score, opp_unstoppable) = self.side_score(opp, own, -pos.player);
+        let mobility_diff = mobility(own, opp, pos.player) as f64 - mobility(opp, own, -pos.player) as f64;
+
+        let score = own_score - opp_score
+            + self.unstoppable_pawn_bonus * own_unstoppable
+            + self.opponent_unstoppable_pawn_penalty * opp_unstoppable
+            + self.mobility_value * mobility_diff;
+        score.round() as i32
+    }
+}
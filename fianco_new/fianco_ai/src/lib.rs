@@ -0,0 +1,153 @@
+mod board;
+mod eval;
+mod search;
+
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::sync::{Mutex, OnceLock, RwLock};
+use std::thread;
+
+use pyo3::exceptions::PyRuntimeError;
+use pyo3::prelude::*;
+
+use board::{encode_move, move_from, move_to, Move, Position, BOARD_MASK, BOARD_SIZE, NO_MOVE};
+use eval::{Evaluator, Weights};
+use search::{Heuristics, Searcher, TranspositionTable, INF};
+
+const TT_BITS: u32 = 20;
+
+type MoveTuple = (i32, i32, i32, i32);
+
+// Kept for the lifetime of the module so iterative deepening and later turns reuse
+// earlier results, and shared without locking by every search thread
+fn transposition_table() -> &'static TranspositionTable {
+    static TT: OnceLock<TranspositionTable> = OnceLock::new();
+    TT.get_or_init(|| TranspositionTable::new(TT_BITS))
+}
+
+fn heuristics() -> &'static Mutex<Heuristics> {
+    static HEURISTICS: OnceLock<Mutex<Heuristics>> = OnceLock::new();
+    HEURISTICS.get_or_init(|| Mutex::new(Heuristics::new()))
+}
+
+// Evaluation tables built by set_weights, so negamax only receives integers
+static EVALUATOR: RwLock<Option<Evaluator>> = RwLock::new(None);
+
+fn move_to_tuple(mv: Move) -> MoveTuple {
+    let (from, to) = (move_from(mv) as i32, move_to(mv) as i32);
+    (from / BOARD_SIZE, from % BOARD_SIZE, to / BOARD_SIZE, to % BOARD_SIZE)
+}
+
+fn tuple_to_move((from_row, from_col, to_row, to_col): MoveTuple) -> Move {
+    encode_move((from_row * BOARD_SIZE + from_col) as usize, (to_row * BOARD_SIZE + to_col) as usize)
+}
+
+fn read_weights(weights: &Bound<'_, PyAny>) -> PyResult<Weights> {
+    Ok(Weights {
+        piece_value: weights.getattr("piece_value")?.extract()?,
+        advancement_value: weights.getattr("advancement_value")?.extract()?,
+        unstoppable_pawn_bonus: weights.getattr("unstoppable_pawn_bonus")?.extract()?,
+        opponent_unstoppable_pawn_penalty: weights.getattr("opponent_unstoppable_pawn_penalty")?.extract()?,
+        center_control_value: weights.getattr("center_control_value")?.extract()?,
+        mobility_value: weights.getattr("mobility_value")?.extract()?,
+        edge_pawn_bonus: weights.getattr("edge_pawn_bonus")?.extract()?,
+    })
+}
+
+/// Build the evaluation tables from a weights object (attributes `piece_value`,
+/// `advancement_value`, ...) for all following searches.
+#[pyfunction]
+fn set_weights(weights: &Bound<'_, PyAny>) -> PyResult<()> {
+    let evaluator = Evaluator::new(&read_weights(weights)?);
+    *EVALUATOR.write().unwrap() = Some(evaluator);
+    Ok(())
+}
+
+/// Search the position given by the `black_bb` / `white_bb` bitboards (bit
+/// row * 9 + col) to `depth` for `player` within the `[alpha, beta]` window, trying
+/// `hint_move` first at the root. The position is evaluated with the weights
+/// last passed to `set_weights`.
+///
+/// `threads - 1` helper threads (default: one per core) search the same root
+/// concurrently, alternating between `depth` and `depth + 1`, and only fill the
+/// shared transposition table; the result always comes from the main thread.
+///
+/// Returns `(best_move, evaluation)` with the move as `(from_row, from_col, to_row, to_col)`
+/// and the evaluation from the point of view of `player`. An evaluation outside the
+/// window is only a bound, and `best_move` is None when every move failed low.
+/// The principal variation can be read back with `tt_best_move`.
+#[pyfunction]
+#[pyo3(signature = (black_bb, white_bb, depth, player, hint_move=None, alpha=-INF, beta=INF, threads=None))]
+fn negamax(
+    py: Python<'_>,
+    black_bb: u128,
+    white_bb: u128,
+    depth: i32,
+    player: i32,
+    hint_move: Option<MoveTuple>,
+    alpha: i32,
+    beta: i32,
+    threads: Option<usize>,
+) -> PyResult<(Option<MoveTuple>, i32)> {
+    let evaluator = EVALUATOR
+        .read()
+        .unwrap()
+        .clone()
+        .ok_or_else(|| PyRuntimeError::new_err("set_weights must be called before negamax"))?;
+    let position = Position::new(black_bb & BOARD_MASK, white_bb & BOARD_MASK, player);
+    let hint_move = hint_move.map_or(NO_MOVE, tuple_to_move);
+    let threads = threads.unwrap_or_else(|| thread::available_parallelism().map_or(1, |n| n.get()));
+
+    let (best_move, evaluation) = py.allow_threads(|| {
+        let tt = transposition_table();
+        let stop = AtomicBool::new(false);
+        thread::scope(|scope| {
+            for i in 1..threads {
+                let (evaluator, position, stop) = (&evaluator, &position, &stop);
+                scope.spawn(move || {
+                    let mut heuristics = Heuristics::new();
+                    let helper_depth = depth + (i & 1) as i32;
+                    Searcher::helper(evaluator, tt, &mut heuristics, stop).search(position, helper_depth, hint_move, alpha, beta);
+                });
+            }
+
+            let mut heuristics = heuristics().lock().unwrap();
+            let result = Searcher::new(&evaluator, tt, &mut heuristics).search(&position, depth, hint_move, alpha, beta);
+            stop.store(true, Ordering::Relaxed);
+            result
+        })
+    });
+    Ok((best_move.map(move_to_tuple), evaluation))
+}
+
+/// Age the transposition table at the start of an AI turn, so the previous
+/// turn's entries are kept for reuse but no longer block replacement.
+#[pyfunction]
+fn new_search() {
+    transposition_table().new_search();
+}
+
+/// Empty the transposition table, e.g. when a new game starts.
+#[pyfunction]
+fn clear_tt() {
+    transposition_table().clear();
+}
+
+/// Best move stored in the transposition table for the position with Zobrist
+/// `hash` (as computed by fianco.py), or None if the table has no entry for it.
+#[pyfunction]
+fn tt_best_move(hash: u64) -> Option<MoveTuple> {
+    transposition_table()
+        .probe(hash)
+        .filter(|entry| entry.best_move != NO_MOVE)
+        .map(|entry| move_to_tuple(entry.best_move))
+}
+
+#[pymodule]
+fn fianco_ai(m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_function(wrap_pyfunction!(set_weights, m)?)?;
+    m.add_function(wrap_pyfunction!(negamax, m)?)?;
+    m.add_function(wrap_pyfunction!(tt_best_move, m)?)?;
+    m.add_function(wrap_pyfunction!(new_search, m)?)?;
+    m.add_function(wrap_pyfunction!(clear_tt, m)?)?;
+    Ok(())
+}
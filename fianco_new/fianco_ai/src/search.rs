@@ -0,0 +1,458 @@
+// Alpha-beta negamax (principal variation search) over bitboard positions.
+
+use std::sync::atomic::{AtomicBool, AtomicU64, AtomicU8, Ordering};
+
+use crate::board::*;
+use crate::eval::Evaluator;
+
+pub const INF: i32 = 1_000_000;
+pub const WIN: i32 = 100_000;
+const WIN_BOUND: i32 = WIN - 1_000;
+
+pub const MAX_PLY: usize = 128;
+
+pub const EXACT: u8 = 0;
+pub const LOWER: u8 = 1;
+pub const UPPER: u8 = 2;
+
+// The flag needs two bits; the rest of its byte holds the entry's age
+const AGE_MASK: u8 = 0x3f;
+
+#[derive(Clone, Copy)]
+pub struct Entry {
+    pub value: i32,
+    pub depth: u8,
+    pub flag: u8,
+    pub age: u8,
+    pub best_move: Move,
+}
+
+impl Entry {
+    fn pack(self) -> u64 {
+        self.value as u32 as u64
+            | (self.depth as u64) << 32
+            | (self.flag as u64 | (self.age as u64) << 2) << 40
+            | (self.best_move as u64) << 48
+    }
+
+    fn unpack(data: u64) -> Self {
+        Entry {
+            value: data as u32 as i32,
+            depth: (data >> 32) as u8,
+            flag: (data >> 40) as u8 & 3,
+            age: (data >> 42) as u8 & AGE_MASK,
+            best_move: (data >> 48) as Move,
+        }
+    }
+}
+
+// The key is stored XORed with the data, so a slot torn by two threads
+// writing at once fails the key check instead of returning a mixed entry
+#[derive(Default)]
+struct Slot {
+    check: AtomicU64,
+    data: AtomicU64,
+}
+
+/// Fixed-size lockless table indexed by `hash & mask`, shared by all search
+/// threads and kept from one search to the next. A slot is overwritten unless
+/// it holds a deeper result stored since the last `new_search`.
+pub struct TranspositionTable {
+    slots: Vec<Slot>,
+    mask: usize,
+    age: AtomicU8,
+}
+
+impl TranspositionTable {
+    pub fn new(bits: u32) -> Self {
+        TranspositionTable {
+            slots: (0..1 << bits).map(|_| Slot::default()).collect(),
+            mask: (1 << bits) - 1,
+            age: AtomicU8::new(0),
+        }
+    }
+
+    /// Start a new search: entries from earlier ones stay readable but may
+    /// be replaced by shallower results.
+    pub fn new_search(&self) {
+        let age = self.age.load(Ordering::Relaxed);
+        self.age.store(age.wrapping_add(1) & AGE_MASK, Ordering::Relaxed);
+    }
+
+    pub fn clear(&self) {
+        for slot in &self.slots {
+            slot.data.store(0, Ordering::Relaxed);
+            slot.check.store(0, Ordering::Relaxed);
+        }
+    }
+
+    pub fn probe(&self, hash: u64) -> Option<Entry> {
+        let slot = &self.slots[hash as usize & self.mask];
+        let data = slot.data.load(Ordering::Relaxed);
+        (slot.check.load(Ordering::Relaxed) ^ data == hash).then(|| Entry::unpack(data))
+    }
+
+    pub fn store(&self, hash: u64, depth: i32, value: i32, flag: u8, best_move: Move) {
+        let slot = &self.slots[hash as usize & self.mask];
+        let age = self.age.load(Ordering::Relaxed);
+        let old = Entry::unpack(slot.data.load(Ordering::Relaxed));
+        if old.age == age && old.depth as i32 > depth {
+            return;
+        }
+        let data = Entry { value, depth: depth as u8, flag, age, best_move }.pack();
+        slot.data.store(data, Ordering::Relaxed);
+        slot.check.store(hash ^ data, Ordering::Relaxed);
+    }
+}
+
+// Win scores are stored relative to the node so they stay valid at any ply
+fn value_to_tt(value: i32, ply: i32) -> i32 {
+    if value > WIN_BOUND {
+        value + ply
+    } else if value < -WIN_BOUND {
+        value - ply
+    } else {
+        value
+    }
+}
+
+fn value_from_tt(value: i32, ply: i32) -> i32 {
+    if value > WIN_BOUND {
+        value - ply
+    } else if value < -WIN_BOUND {
+        value + ply
+    } else {
+        value
+    }
+}
+
+const HINT_SCORE: i32 = 1 << 30;
+const CAPTURE_SCORE: i32 = 1 << 29;
+const KILLER_SCORES: [i32; 2] = [1 << 28, 1 << 27];
+const HISTORY_MAX: i32 = 1 << 26;
+
+/// Killer moves per ply and history counters per (player, from, to) for
+/// ordering quiet moves, kept from one search to the next.
+pub struct Heuristics {
+    killers: [[Move; 2]; MAX_PLY],
+    history: Box<[[[i32; NUM_SQUARES]; NUM_SQUARES]; 2]>,
+}
+
+impl Heuristics {
+    pub fn new() -> Self {
+        Heuristics { killers: [[NO_MOVE; 2]; MAX_PLY], history: Box::new([[[0; NUM_SQUARES]; NUM_SQUARES]; 2]) }
+    }
+
+    fn score(&self, mv: Move, hint: Move, player: i32, ply: usize) -> i32 {
+        if mv == hint {
+            HINT_SCORE
+        } else if is_capture(mv) {
+            // All pieces are worth the same, so there is no MVV-LVA term
+            CAPTURE_SCORE
+        } else if mv == self.killers[ply][0] {
+            KILLER_SCORES[0]
+        } else if mv == self.killers[ply][1] {
+            KILLER_SCORES[1]
+        } else {
+            self.history[color_index(player)][move_from(mv)][move_to(mv)]
+        }
+    }
+
+    fn record_cutoff(&mut self, mv: Move, player: i32, ply: usize, depth: i32) {
+        if self.killers[ply][0] != mv {
+            self.killers[ply][1] = self.killers[ply][0];
+            self.killers[ply][0] = mv;
+        }
+        let entry = &mut self.history[color_index(player)][move_from(mv)][move_to(mv)];
+        *entry = (*entry + depth * depth).min(HISTORY_MAX);
+    }
+}
+
+impl Default for Heuristics {
+    fn default() -> Self {
+        Self::new()
+    }
+}
+
+// Partial selection sort: bring the best-scored remaining move to index i
+fn pick_next(moves: &mut [Move], scores: &mut [i32], i: usize) {
+    let mut best = i;
+    for j in i + 1..moves.len() {
+        if scores[j] > scores[best] {
+            best = j;
+        }
+    }
+    moves.swap(i, best);
+    scores.swap(i, best);
+}
+
+pub struct Searcher<'a> {
+    evaluator: &'a Evaluator,
+    tt: &'a TranspositionTable,
+    heuristics: &'a mut Heuristics,
+    stop: Option<&'a AtomicBool>,
+    aborted: bool,
+    root_hint: Move,
+    root_best: Move,
+    pub nodes: u64,
+}
+
+impl<'a> Searcher<'a> {
+    pub fn new(evaluator: &'a Evaluator, tt: &'a TranspositionTable, heuristics: &'a mut Heuristics) -> Self {
+        Searcher { evaluator, tt, heuristics, stop: None, aborted: false, root_hint: NO_MOVE, root_best: NO_MOVE, nodes: 0 }
+    }
+
+    /// A helper for lazy SMP: abandons its search, without touching the
+    /// transposition table again, once `stop` is set.
+    pub fn helper(evaluator: &'a Evaluator, tt: &'a TranspositionTable, heuristics: &'a mut Heuristics, stop: &'a AtomicBool) -> Self {
+        Searcher { stop: Some(stop), ..Searcher::new(evaluator, tt, heuristics) }
+    }
+
+    /// Search the root to `depth` within `[alpha, beta]`, trying `hint_move`
+    /// (usually the previous iteration's best move) first; returns the best
+    /// move, if any move scored above `alpha`, and its score for the side to
+    /// move. The principal variation is left in the transposition table.
+    pub fn search(&mut self, pos: &Position, depth: i32, hint_move: Move, alpha: i32, beta: i32) -> (Option<Move>, i32) {
+        self.root_hint = hint_move;
+        self.root_best = NO_MOVE;
+        let score = self.negamax(pos, depth, 0, alpha, beta);
+        ((self.root_best != NO_MOVE).then_some(self.root_best), score)
+    }
+
+    fn negamax(&mut self, pos: &Position, depth: i32, ply: i32, mut alpha: i32, mut beta: i32) -> i32 {
+        self.nodes += 1;
+
+        if let Some(stop) = self.stop {
+            if stop.load(Ordering::Relaxed) {
+                self.aborted = true;
+                return 0;
+            }
+        }
+
+        if pos.is_lost() {
+            return -WIN + ply;
+        }
+
+        let mut hint = if ply == 0 { self.root_hint } else { NO_MOVE };
+        if let Some(entry) = self.tt.probe(pos.hash) {
+            if hint == NO_MOVE {
+                hint = entry.best_move;
+            }
+            // Never cut at the root: the caller needs a move from there
+            if ply > 0 && entry.depth as i32 >= depth {
+                let value = value_from_tt(entry.value, ply);
+                match entry.flag {
+                    EXACT => return value,
+                    LOWER => alpha = alpha.max(value),
+                    _ => beta = beta.min(value),
+                }
+                if alpha >= beta {
+                    return value;
+                }
+            }
+        }
+
+        if depth == 0 {
+            return self.qsearch(pos, ply, alpha, beta);
+        }
+
+        let mut moves = MoveList::new();
+        pos.generate_moves(&mut moves);
+        if moves.is_empty() {
+            return -WIN + ply;
+        }
+        let ply_index = (ply as usize).min(MAX_PLY - 1);
+        let mut scores = [0; MAX_MOVES];
+        for (i, &mv) in moves.iter().enumerate() {
+            scores[i] = self.heuristics.score(mv, hint, pos.player, ply_index);
+        }
+
+        let alpha_orig = alpha;
+        let mut best = -INF;
+        let mut best_move = NO_MOVE;
+
+        for i in 0..moves.len() {
+            pick_next(&mut moves, &mut scores, i);
+            let mv = moves[i];
+            let child = pos.make_move(mv);
+
+            // Principal variation search: full window for the first move, a null
+            // window for the rest, re-searching only when one of them fails high
+            let mut score;
+            if i == 0 {
+                score = -self.negamax(&child, depth - 1, ply + 1, -beta, -alpha);
+            } else {
+                score = -self.negamax(&child, depth - 1, ply + 1, -alpha - 1, -alpha);
+                if score > alpha && score < beta {
+                    score = -self.negamax(&child, depth - 1, ply + 1, -beta, -score);
+                }
+            }
+            if self.aborted {
+                return 0;
+            }
+            if score > best {
+                best = score;
+                best_move = mv;
+            }
+            if score > alpha {
+                alpha = score;
+                if ply == 0 {
+                    self.root_best = mv;
+                }
+            }
+            if alpha >= beta {
+                if !is_capture(mv) {
+                    self.heuristics.record_cutoff(mv, pos.player, ply_index, depth);
+                }
+                break;
+            }
+        }
+
+        let flag = if best <= alpha_orig {
+            UPPER
+        } else if best >= beta {
+            LOWER
+        } else {
+            EXACT
+        };
+        self.tt.store(pos.hash, depth, value_to_tt(best, ply), flag, best_move);
+        best
+    }
+
+    // Play out pending captures before evaluating, to avoid horizon effects.
+    // Captures are compulsory, so only a position without one may stand pat.
+    fn qsearch(&mut self, pos: &Position, ply: i32, mut alpha: i32, beta: i32) -> i32 {
+        self.nodes += 1;
+
+        if pos.is_lost() {
+            return -WIN + ply;
+        }
+
+        let mut moves = MoveList::new();
+        pos.generate_captures(&mut moves);
+        if moves.is_empty() {
+            return self.evaluator.evaluate(pos);
+        }
+
+        let mut best = -INF;
+        for &mv in moves.iter() {
+            let score = -self.qsearch(&pos.make_move(mv), ply + 1, -beta, -alpha);
+            if score > best {
+                best = score;
+            }
+            if score > alpha {
+                alpha = score;
+            }
+            if alpha >= beta {
+                break;
+            }
+        }
+        best
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::eval::Weights;
+
+    const START_BLACK: u128 = 0x1411105ff;
+    const START_WHITE: u128 = 0x1ff411105000000000000;
+
+    fn evaluator() -> Evaluator {
+        Evaluator::new(&Weights {
+            piece_value: 10.0,
+            advancement_value: 5.0,
+            unstoppable_pawn_bonus: 100.0,
+            opponent_unstoppable_pawn_penalty: -100.0,
+            center_control_value: 0.5,
+            mobility_value: 3.0,
+            edge_pawn_bonus: 2.0,
+        })
+    }
+
+    // Positions reached by random play from the start, on a fixed seed
+    fn positions(count: usize) -> Vec<Position> {
+        let mut rng = 0x9e3779b97f4a7c15u64;
+        let mut result = Vec::new();
+        while result.len() < count {
+            let mut pos = Position::new(START_BLACK, START_WHITE, WHITE);
+            for _ in 0..result.len() % 40 {
+                let mut moves = MoveList::new();
+                pos.generate_moves(&mut moves);
+                if pos.is_lost() || moves.is_empty() {
+                    break;
+                }
+                rng ^= rng << 13;
+                rng ^= rng >> 7;
+                rng ^= rng << 17;
+                pos = pos.make_move(moves[rng as usize % moves.len()]);
+            }
+            result.push(pos);
+        }
+        result
+    }
+
+    // Plain minimax over every move, with the same capture-only quiescence
+    fn minimax(pos: &Position, depth: i32, ply: i32, evaluator: &Evaluator) -> i32 {
+        if pos.is_lost() {
+            return -WIN + ply;
+        }
+        let mut moves = MoveList::new();
+        if depth > 0 {
+            pos.generate_moves(&mut moves);
+            if moves.is_empty() {
+                return -WIN + ply;
+            }
+        } else {
+            pos.generate_captures(&mut moves);
+            if moves.is_empty() {
+                return evaluator.evaluate(pos);
+            }
+        }
+        moves.iter().map(|&mv| -minimax(&pos.make_move(mv), depth - 1, ply + 1, evaluator)).max().unwrap()
+    }
+
+    fn search(pos: &Position, depth: i32, alpha: i32, beta: i32, evaluator: &Evaluator) -> (Option<Move>, i32) {
+        let tt = TranspositionTable::new(16);
+        let mut heuristics = Heuristics::new();
+        let mut searcher = Searcher::new(evaluator, &tt, &mut heuristics);
+        let mut result = (None, 0);
+        for d in 1..depth {
+            result = searcher.search(pos, d, result.0.unwrap_or(NO_MOVE), -INF, INF);
+        }
+        searcher.search(pos, depth, result.0.unwrap_or(NO_MOVE), alpha, beta)
+    }
+
+    #[test]
+    fn search_matches_minimax() {
+        let evaluator = evaluator();
+        for pos in positions(60) {
+            for depth in 1..=4 {
+                let expected = minimax(&pos, depth, 0, &evaluator);
+                let (best_move, value) = search(&pos, depth, -INF, INF, &evaluator);
+                assert_eq!(value, expected, "depth {depth}");
+                if let Some(mv) = best_move {
+                    assert_eq!(-minimax(&pos.make_move(mv), depth - 1, 1, &evaluator), expected, "depth {depth}");
+                }
+            }
+        }
+    }
+
+    #[test]
+    fn window_results_are_bounds() {
+        let evaluator = evaluator();
+        for pos in positions(40) {
+            let depth = 3;
+            let exact = minimax(&pos, depth, 0, &evaluator);
+            // Fails low: an upper bound between the true value and alpha
+            let (_, value) = search(&pos, depth, exact + 10, exact + 30, &evaluator);
+            assert!(exact <= value && value <= exact + 10);
+            // Fails high: a lower bound between beta and the true value
+            let (_, value) = search(&pos, depth, exact - 30, exact - 10, &evaluator);
+            assert!(exact - 10 <= value && value <= exact);
+            let (_, value) = search(&pos, depth, exact - 10, exact + 10, &evaluator);
+            assert_eq!(value, exact);
+        }
+    }
+}
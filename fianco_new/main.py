@@ -3,7 +3,9 @@
 import pygame
 from fianco import GameState, BLACK, WHITE, EMPTY
 from ai import get_best_move
+from fianco_ai import clear_tt
 import sys
+import queue
 import threading
 
 
@@ -18,6 +20,10 @@ pygame.display.set_caption('Fianco')
 font = pygame.font.Font(None, FONT_SIZE)
 
 HIGHLIGHT_COLOR = (0, 255, 0)  # Green
+RESTART_BUTTON_RECT = pygame.Rect(10, SCREEN_SIZE + 80, 100, 30)
+
+# Coordinate labels never change, so render them once
+COORDINATE_LABELS = {label: font.render(label, True, (0, 0, 0)) for label in 'ABCDEFGHI123456789'}
 
 class Weights:
     def __init__(self, **kwargs):
@@ -45,10 +51,10 @@ def draw_board(screen, game_state, possible_moves=None):
     # Draw coordinates
     for i in range(9):
         # Columns
-        col_label = font.render(chr(ord('A') + i), True, (0, 0, 0))
+        col_label = COORDINATE_LABELS[chr(ord('A') + i)]
         screen.blit(col_label, (i * CELL_SIZE + CELL_SIZE // 2 - col_label.get_width() // 2, SCREEN_SIZE))
         # Rows
-        row_label = font.render(str(9 - i), True, (0, 0, 0))
+        row_label = COORDINATE_LABELS[str(9 - i)]
         screen.blit(row_label, (SCREEN_SIZE, i * CELL_SIZE + CELL_SIZE // 2 - row_label.get_height() // 2))
 
     # Highlight possible moves
@@ -62,7 +68,7 @@ def draw_board(screen, game_state, possible_moves=None):
     # Draw pieces
     for row in range(9):
         for col in range(9):
-            piece = game_state.board[row, col]
+            piece = game_state.piece_at(row, col)
             if piece != 0:
                 center = (col * CELL_SIZE + CELL_SIZE // 2, row * CELL_SIZE + CELL_SIZE // 2)
                 if piece == 1:
@@ -85,8 +91,7 @@ def draw_evaluation(screen, evaluation):
     screen.blit(text, (10, y_offset))
 
 def draw_restart_button(screen):
-    y_offset = SCREEN_SIZE + 80
-    rect = pygame.Rect(10, y_offset, 100, 30)
+    rect = RESTART_BUTTON_RECT
     pygame.draw.rect(screen, (200, 200, 200), rect)
     text = font.render('Restart', True, (0, 0, 0))
     screen.blit(text, (rect.x + 10, rect.y + 5))
@@ -109,35 +114,47 @@ def main():
     running = True
     evaluation = 0
 
-    ai_pv = []
-    ai_thread = None
-    ai_move_event = threading.Event()
-    ai_move = None
-
-    def pv_callback(pv_moves):
-        with threading.Lock():
-            ai_pv.clear()
-            ai_pv.extend(pv_moves)
-
-    def ai_think():
-        nonlocal evaluation, ai_move
-        print("AI is thinking...")
-        game_state_copy = game_state.copy()
-        move, evaluation = get_best_move(game_state_copy, 6, pv_callback=pv_callback, weights=weights)
-        print(f"AI move: {move}, evaluation: {evaluation}")
-        ai_move = move
-        ai_move_event.set()
-        nonlocal ai_thread
-        ai_thread = None
+    # Bumped on restart, so results and PVs from searches of an earlier game
+    # are recognised and dropped
+    generation = 0
+    # Latest (generation, principal variation); the AI thread replaces the
+    # tuple in one assignment, which is atomic under the GIL
+    ai_pv = [(generation, ())]
+    ai_jobs = queue.Queue()
+    ai_results = queue.Queue()
+    ai_busy = False
+    dirty = True  # Redraw only when something on screen changed
+
+    def pv_callback(job_generation, pv_moves):
+        nonlocal dirty
+        ai_pv[0] = (job_generation, tuple(pv_moves))
+        dirty = True
+
+    def ai_worker():
+        # One long-lived thread serving (generation, game state snapshot, depth) jobs
+        while True:
+            job_generation, game_state_copy, depth = ai_jobs.get()
+            print("AI is thinking...")
+            move, ai_evaluation = get_best_move(
+                game_state_copy, depth,
+                pv_callback=lambda pv_moves: pv_callback(job_generation, pv_moves),
+                weights=weights)
+            print(f"AI move: {move}, evaluation: {ai_evaluation}")
+            ai_results.put((job_generation, move, ai_evaluation))
+
+    threading.Thread(target=ai_worker, daemon=True).start()
 
     while running:
-        screen.fill((255, 255, 255))
-        draw_board(screen, game_state, possible_moves)
-        draw_move_history(screen, game_state.move_history)
-        draw_evaluation(screen, evaluation)
-        restart_button_rect = draw_restart_button(screen)
-        draw_principal_variation(screen, ai_pv, game_state)
-        pygame.display.flip()
+        if dirty:
+            dirty = False
+            screen.fill((255, 255, 255))
+            draw_board(screen, game_state, possible_moves)
+            draw_move_history(screen, game_state.move_history)
+            draw_evaluation(screen, evaluation)
+            draw_restart_button(screen)
+            pv_generation, pv_moves = ai_pv[0]
+            draw_principal_variation(screen, pv_moves if pv_generation == generation else (), game_state)
+            pygame.display.flip()
 
         if game_state.is_game_over():
             winner = 'Black' if game_state.winner == 1 else 'White' if game_state.winner == -1 else 'No one'
@@ -145,23 +162,30 @@ def main():
             running = False
             continue
 
-        # Get valid moves and check for captures
-        valid_moves = game_state.get_valid_moves()
-        capture_available = any(abs(move[0][0] - move[1][0]) == 2 for move in valid_moves)
-
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
                 sys.exit()
 
+            elif event.type == pygame.VIDEOEXPOSE:
+                dirty = True
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
+                dirty = True
                 mouse_pos = pygame.mouse.get_pos()
-                if restart_button_rect.collidepoint(mouse_pos):
+                if RESTART_BUTTON_RECT.collidepoint(mouse_pos):
                     game_state.reset()
+                    clear_tt()
+                    generation += 1
+                    # A search of the old game may still be running; its result is dropped
+                    ai_busy = False
                     selected_piece = None
                     possible_moves = []
                     evaluation = 0
-                    ai_pv.clear()
+                    continue
+
+                # The board belongs to the AI while it is Black's turn
+                if ai_enabled and game_state.current_player == BLACK:
                     continue
 
                 col = mouse_pos[0] // CELL_SIZE
@@ -176,9 +200,10 @@ def main():
                         else:
                             selected_piece = None
                             possible_moves = []
-                    elif game_state.board[row, col] == game_state.current_player:
+                    elif game_state.piece_at(row, col) == game_state.current_player:
                         piece_moves, piece_capture_moves = game_state.get_piece_moves((row, col))
-                        if capture_available:
+                        # Captures are compulsory; the flag is cached on the game state
+                        if game_state.is_capture_available():
                             if piece_capture_moves:
                                 selected_piece = (row, col)
                                 possible_moves = piece_capture_moves
@@ -195,19 +220,25 @@ def main():
                 pass
         
         # Apply AI move if available
-        if ai_move_event.is_set():
-            ai_move_event.clear()
-            if ai_move:
-                game_state.make_move(ai_move)
-
-            else:
-                game_state.winner = -game_state.current_player
-            ai_move = None
-
-        if ai_enabled and game_state.current_player == BLACK and ai_thread is None:
-            print("Starting AI thread")
-            ai_thread = threading.Thread(target=ai_think)
-            ai_thread.start()
+        try:
+            result_generation, ai_move, ai_evaluation = ai_results.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            if result_generation == generation:
+                ai_busy = False
+            # Only a search of this game, still waiting on Black's move, may play
+            if result_generation == generation and game_state.current_player == BLACK:
+                dirty = True
+                evaluation = ai_evaluation
+                if ai_move:
+                    game_state.make_move(ai_move)
+                else:
+                    game_state.winner = -game_state.current_player
+
+        if ai_enabled and game_state.current_player == BLACK and not ai_busy:
+            ai_jobs.put((generation, game_state.copy(with_history=False), 6))
+            ai_busy = True
 
         
 
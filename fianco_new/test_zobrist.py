@@ -0,0 +1,58 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from fianco import GameState, START_BLACK_BB, START_WHITE_BB, START_HASH, ZOBRIST_SIDE, zobrist_hash
+
+# Same values as the zobrist test in fianco_ai/src/board.rs
+START_BLACK_BB_RUST = 0x1411105ff
+START_WHITE_BB_RUST = 0x1ff411105000000000000
+START_HASH_RUST = 0x4681cfdef1afa554
+ZOBRIST_SIDE_RUST = 0x61729b38ccfd3cdd
+
+
+def test_keys_match_engine():
+    assert (START_BLACK_BB, START_WHITE_BB) == (START_BLACK_BB_RUST, START_WHITE_BB_RUST)
+    assert START_HASH == START_HASH_RUST
+    assert ZOBRIST_SIDE == ZOBRIST_SIDE_RUST
+
+
+def test_incremental_hash():
+    rng = random.Random(0)
+    game_state = GameState()
+    for _ in range(60):
+        moves = game_state.get_valid_moves()
+        if game_state.winner is not None or not moves:
+            break
+        game_state.make_move(rng.choice(moves))
+        assert game_state.hash == zobrist_hash(game_state.black_bb, game_state.white_bb, game_state.current_player)
+
+
+def test_engine_stores_under_python_hash():
+    # The engine's table is looked up with fianco.py's hash, e.g. to walk the PV
+    fianco_ai = pytest.importorskip("fianco_ai")
+    if not hasattr(fianco_ai, "negamax"):
+        # Only the crate directory was found, the extension is not built
+        pytest.skip("fianco_ai extension not built")
+    fianco_ai.set_weights(SimpleNamespace(
+        piece_value=10.0,
+        advancement_value=5.0,
+        unstoppable_pawn_bonus=100.0,
+        opponent_unstoppable_pawn_penalty=-100.0,
+        center_control_value=0.5,
+        mobility_value=3.0,
+        edge_pawn_bonus=2.0,
+    ))
+    fianco_ai.clear_tt()
+    rng = random.Random(0)
+    game_state = GameState()
+    for _ in range(20):
+        moves = game_state.get_valid_moves()
+        if game_state.winner is not None or not moves:
+            break
+        # One thread, so no helper can overwrite the root entry with its own move
+        best_move, _ = fianco_ai.negamax(game_state.black_bb, game_state.white_bb, 2, game_state.current_player,
+                                         threads=1)
+        assert fianco_ai.tt_best_move(game_state.hash) == best_move
+        game_state.make_move(rng.choice(moves))